@@ -16,7 +16,10 @@ setup(
         "astropy>=1.0.2",
         "emcee>=2.2.0,<3.0",
         "corner",
-        "matplotlib",
+        # np.quantile(method=...) and np.random.default_rng
+        "numpy>=1.22",
+        # Axes.stairs
+        "matplotlib>=3.4",
         "scipy",
         "h5py",
         "pyyaml",
@@ -1,13 +1,22 @@
 # -*- coding: utf-8 -*-
 # Licensed under a 3-clause BSD style license - see LICENSE.rst
 import warnings
+import weakref
 
 import astropy.units as u
 import numpy as np
 from astropy import log
 
+from .extern.interruptible_pool import InterruptiblePool
 from .utils import sed_conversion, validate_data_table
 
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 __all__ = [
     "normal_prior",
     "uniform_prior",
@@ -59,6 +68,74 @@ def log_uniform_prior(value, umin=0, umax=None):
 
 # Probability function
 
+if HAS_NUMBA:
+    # Single-pass likelihood kernels for the MCMC hot path. They fuse the
+    # subtract, square, error selection, and sum into one loop with no
+    # temporary arrays, and are compiled once and cached on disk.
+
+    @njit(cache=True, fastmath=True)
+    def _loglikelihood_sym(model, flux, inv_var):
+        total = 0.0
+        for i in range(model.shape[0]):
+            d = model[i] - flux[i]
+            total += d * d * inv_var[i]
+        return -0.5 * total
+
+    @njit(cache=True, fastmath=True)
+    def _loglikelihood_asym(model, flux, inv_var_lo, inv_var_hi):
+        total = 0.0
+        for i in range(model.shape[0]):
+            d = model[i] - flux[i]
+            if d > 0:
+                total += d * d * inv_var_hi[i]
+            else:
+                total += d * d * inv_var_lo[i]
+        return -0.5 * total
+
+
+def _lnprobmodel_cache(data):
+    """
+    Precompute the quantities needed by `lnprobmodel` that depend only on the
+    observed spectrum: upper limit masks, non-upper-limit fluxes, and the
+    inverse variances of the flux measurements. The result is stored as a
+    private attribute of the data table so that it is computed once per run
+    instead of at every likelihood evaluation.
+    """
+    cache = getattr(data, "_lnprobmodel_cache", None)
+
+    if cache is None:
+        ul = np.asarray(data["ul"], dtype=bool)
+        notul = ~ul
+        f_unit = data["flux"].unit
+        err_lo = data["flux_error_lo"][notul]
+        err_hi = data["flux_error_hi"][notul]
+        cache = {
+            # integer index arrays: gathering with take/fancy indexing avoids
+            # re-scanning a boolean mask at every likelihood evaluation
+            "notul_idx": np.flatnonzero(notul),
+            "ul_idx": np.flatnonzero(ul),
+            "n_ul": int(np.sum(ul)),
+            "f_unit": f_unit,
+            "flux": data["flux"][notul],
+            "flux_ul": data["flux"][ul],
+            "cl": np.asarray(data["cl"]),
+            "symmetric": bool(np.all(err_lo == err_hi)),
+            "inv_var_lo": 1 / err_lo ** 2,
+            "inv_var_hi": 1 / err_hi ** 2,
+        }
+        if HAS_NUMBA:
+            # unitless copies for the compiled kernels
+            cache["flux_v"] = data["flux"][notul].to_value(f_unit)
+            cache["inv_var_lo_v"] = cache["inv_var_lo"].to_value(f_unit ** -2)
+            cache["inv_var_hi_v"] = cache["inv_var_hi"].to_value(f_unit ** -2)
+        try:
+            data._lnprobmodel_cache = cache
+        except AttributeError:
+            # cannot attach attributes to this container, recompute next time
+            pass
+
+    return cache
+
 
 def lnprobmodel(model, data):
 
@@ -72,33 +149,56 @@ def lnprobmodel(model, data):
         )
         model = (model * sed_factor).to(data["flux"].unit)
 
-    ul = data["ul"]
-    notul = ~ul
+    cache = _lnprobmodel_cache(data)
 
-    difference = model[notul] - data["flux"][notul]
+    if HAS_NUMBA and model.ndim == 1:
+        model_v = model.take(cache["notul_idx"]).to_value(cache["f_unit"])
+        if cache["symmetric"]:
+            totallogprob = _loglikelihood_sym(
+                model_v, cache["flux_v"], cache["inv_var_lo_v"]
+            )
+        else:
+            totallogprob = _loglikelihood_asym(
+                model_v,
+                cache["flux_v"],
+                cache["inv_var_lo_v"],
+                cache["inv_var_hi_v"],
+            )
+    else:
+        # model may be a batch of spectra with shape (..., nbins), e.g. when
+        # evaluated for all walkers at once; reduce along the energy axis so
+        # a matching batch of log-probabilities is returned
+        difference = model[..., cache["notul_idx"]] - cache["flux"]
 
-    # use different errors for model above or below data
-    sign = difference > 0
-    loerr, hierr = 1 * ~sign, 1 * sign
-    logprob = -difference ** 2 / (
-        2.0
-        * (
-            loerr * data["flux_error_lo"][notul]
-            + hierr * data["flux_error_hi"][notul]
-        )
-        ** 2
-    )
+        if cache["symmetric"]:
+            inv_var = cache["inv_var_lo"]
+        else:
+            # use different errors for model above or below data
+            inv_var = np.where(
+                difference > 0, cache["inv_var_hi"], cache["inv_var_lo"]
+            )
 
-    totallogprob = np.sum(logprob)
+        totallogprob = -0.5 * np.sum(difference ** 2 * inv_var, axis=-1)
 
-    if np.sum(ul) > 0:
+    if cache["n_ul"] > 0:
         # deal with upper limits at CL set by data['cl']
-        violated_uls = np.sum(model[ul] > data["flux"][ul])
-        totallogprob += violated_uls * np.log(1.0 - data["cl"][violated_uls])
+        violated_uls = np.sum(
+            model[..., cache["ul_idx"]] > cache["flux_ul"], axis=-1
+        )
+        totallogprob += violated_uls * np.log(1.0 - cache["cl"][violated_uls])
 
     return totallogprob
 
 
+# Whether the spectrum returned by a model function is duplicated among its
+# blobs is a property of the model function, not of the parameter vector, so
+# the np.array_equal scan over the blobs only needs to be done on the first
+# call for each model. Weak keys let entries disappear with the model
+# function instead of pinning it (and anything it closes over) for the
+# lifetime of the process.
+_MODEL_IN_BLOB_CACHE = weakref.WeakKeyDictionary()
+
+
 def lnprob(pars, data, modelfunc, priorfunc):
 
     if priorfunc is None:
@@ -118,15 +218,24 @@ def lnprob(pars, data, modelfunc, priorfunc):
         ):
             model = modelout[0]
 
-            MODEL_IN_BLOB = False
-            for blob in modelout[1:]:
+            try:
+                MODEL_IN_BLOB = _MODEL_IN_BLOB_CACHE[modelfunc]
+            except (KeyError, TypeError):
+                # TypeError: the callable cannot be weakly referenced
+                MODEL_IN_BLOB = False
+                for blob in modelout[1:]:
+                    try:
+                        if np.array_equal(blob, model):
+                            MODEL_IN_BLOB = True
+                    except (TypeError, u.UnitConversionError):
+                        # np.array_equal will fail if there is no
+                        # __array_function__ implementation in one of the
+                        # types, or if they are of incompatible types
+                        pass
                 try:
-                    if np.array_equal(blob, model):
-                        MODEL_IN_BLOB = True
-                except (TypeError, u.UnitConversionError):
-                    # np.array_equal will fail if there is no
-                    # __array_function__ implementation in one of the types, or
-                    # if they are of incompatible types
+                    _MODEL_IN_BLOB_CACHE[modelfunc] = MODEL_IN_BLOB
+                except TypeError:
+                    # not all callables can be weakly referenced
                     pass
 
             if MODEL_IN_BLOB:
@@ -149,40 +258,53 @@ def lnprob(pars, data, modelfunc, priorfunc):
 
 # Sampler funcs
 
+# State shared with the pool workers. It is populated once per worker through
+# the pool initializer so that the data table and model function are only
+# pickled when the pool is started instead of once per likelihood evaluation.
+_WORKER_STATE = {}
+
+
+def _set_worker_state(data, modelfunc, priorfunc):
+    _WORKER_STATE["data"] = data
+    _WORKER_STATE["modelfunc"] = modelfunc
+    _WORKER_STATE["priorfunc"] = priorfunc
+
+
+def _lnprob_from_state(pars):
+    return lnprob(
+        pars,
+        _WORKER_STATE["data"],
+        _WORKER_STATE["modelfunc"],
+        _WORKER_STATE["priorfunc"],
+    )
+
 
 def _run_mcmc(sampler, pos, nrun):
     for i, out in enumerate(sampler.sample(pos, iterations=nrun)):
         progress = 100.0 * float(i) / float(nrun)
         if progress % 5 < (5.0 / float(nrun)):
-            print(
-                "\nProgress of the run: {0:.0f} percent"
-                " ({1} of {2} steps)".format(int(progress), i, nrun)
-            )
             npars = out[0].shape[-1]
             paravg, parstd = [], []
             for npar in range(npars):
                 paravg.append(np.median(out[0][:, npar]))
                 parstd.append(np.std(out[0][:, npar]))
-            print(
-                "                           "
+            log.info(
+                "Progress of the run: {0:.0f} percent"
+                " ({1} of {2} steps)\n".format(int(progress), i, nrun)
+                + "                           "
                 + (" ".join(["{%i:-^15}" % i for i in range(npars)])).format(
                     *sampler.labels
                 )
-            )
-            print(
-                "  Last ensemble median : "
+                + "\n  Last ensemble median : "
                 + (" ".join(["{%i:^15.3g}" % i for i in range(npars)])).format(
                     *paravg
                 )
-            )
-            print(
-                "  Last ensemble std    : "
+                + "\n  Last ensemble std    : "
                 + (" ".join(["{%i:^15.3g}" % i for i in range(npars)])).format(
                     *parstd
                 )
-            )
-            print(
-                "  Last ensemble lnprob :  avg: {0:.3f}, max: {1:.3f}".format(
+                + "\n  Last ensemble lnprob :"
+                + "  avg: {0:.3f}, max: {1:.3f}".format(
                     np.average(out[1]), np.max(out[1])
                 )
             )
@@ -263,6 +385,7 @@ def get_sampler(
     labels=None,
     threads=4,
     data_sed=None,
+    seed=None,
 ):
     """Generate a new MCMC sampler.
 
@@ -353,6 +476,9 @@ def get_sampler(
         When providing more than one data table, whether to convert them to SED
         format. If unset or None, all tables will be converted to the format of
         the first table.
+    seed : int, optional
+        Seed for the random number generator used to initialize the walker
+        ball. Default is None, which draws a fresh random state on every call.
 
     Returns
     -------
@@ -375,6 +501,10 @@ def get_sampler(
     if model is None:
         raise TypeError("Model function is missing!")
 
+    # Work on a float copy so the normalization guess and prefit do not
+    # modify the caller's initial parameter vector in place
+    p0 = np.array(p0, dtype=float)
+
     # Add parameter labels if not provided or too short
     if labels is None:
         # First is normalization
@@ -483,9 +613,26 @@ def get_sampler(
     if prefit and not P0_IS_ML:
         p0, P0_IS_ML = _prefit(p0, data, model, prior)
 
-    sampler = emcee.EnsembleSampler(
-        nwalkers, len(p0), lnprob, args=[data, model, prior], threads=threads
-    )
+    # The interactive fitter and the prefit can re-bind p0 as a plain list,
+    # which the walker-ball draw below does not accept
+    p0 = np.asarray(p0, dtype=float)
+
+    if threads > 1:
+        # Initialize the workers with the data table and model so they are
+        # only serialized once per worker rather than at every step
+        _set_worker_state(data, model, prior)
+        pool = InterruptiblePool(
+            threads,
+            initializer=_set_worker_state,
+            initargs=(data, model, prior),
+        )
+        sampler = emcee.EnsembleSampler(
+            nwalkers, len(p0), _lnprob_from_state, pool=pool
+        )
+    else:
+        sampler = emcee.EnsembleSampler(
+            nwalkers, len(p0), lnprob, args=[data, model, prior]
+        )
 
     # Add data and parameters properties to sampler
     sampler.data_table = data_table
@@ -505,11 +652,13 @@ def get_sampler(
     # Initialize walkers in a ball of relative size 0.5% in all dimensions if
     # the parameters have been fit to their ML values, or to 10% otherwise
     spread = 0.005 if P0_IS_ML else 0.1
-    p0var = np.array([spread * pp for pp in p0])
-    p0 = emcee.utils.sample_ball(p0, p0var, nwalkers)
+    rng = np.random.default_rng(seed)
+    p0 = p0 + np.abs(spread * p0) * rng.standard_normal((nwalkers, len(p0)))
+    if seed is not None:
+        sampler.run_info["seed"] = seed
 
     if nburn > 0:
-        print(
+        log.info(
             "Burning in the {0} walkers with {1} steps...".format(
                 nwalkers, nburn
             )
@@ -557,8 +706,16 @@ def run_sampler(nrun=100, sampler=None, pos=None, **kwargs):
 
     sampler.run_info["n_run"] = nrun
 
-    print("\nWalker burn in finished, running {0} steps...".format(nrun))
+    log.info("Walker burn in finished, running {0} steps...".format(nrun))
     sampler.reset()
+    # Results cached on the sampler by the plotting helpers are keyed by the
+    # chain shape, which an equal-length rerun would reproduce, so they have
+    # to be dropped explicitly when the chain is discarded
+    for cache in ("_find_ML_cache", "_autocorr_cache"):
+        try:
+            delattr(sampler, cache)
+        except AttributeError:
+            pass
     sampler, pos = _run_mcmc(sampler, pos, nrun)
 
     return sampler, pos
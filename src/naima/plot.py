@@ -113,14 +113,81 @@ def _latex_value_error(val, elo, ehi=0, tol=0.25):
     return "$" + string + "$"
 
 
+def _get_autocorr_times(sampler):
+    """
+    Compute the integrated autocorrelation times of all parameters at once,
+    caching them on the sampler so that the per-parameter chain plots do not
+    redo the full computation npars times. The cache is keyed on the chain
+    shape so it is refreshed when the sampler is run further.
+
+    Returns `None` when the chain is too short for a meaningful estimate.
+    """
+    shape = sampler.chain.shape
+    cached = getattr(sampler, "_autocorr_cache", None)
+
+    if cached is None or cached[0] != shape:
+        try:
+            try:
+                ac = sampler.get_autocorr_time()
+            except AttributeError:
+                ac = autocorr.integrated_time(
+                    np.mean(sampler.chain, axis=0), axis=0, fast=False
+                )
+        except autocorr.AutocorrError:
+            # Raised when chain is too short for meaningful auto-correlation
+            # estimation
+            ac = None
+        cached = (shape, ac)
+        try:
+            sampler._autocorr_cache = cached
+        except AttributeError:
+            pass
+
+    return cached[1]
+
+
+def _kde_evaluate(dist, grid):
+    """
+    Evaluate a gaussian kernel density estimate of ``dist`` on ``grid``.
+
+    Uses the O(N log N) FFT-based estimator from KDEpy when it is installed,
+    and falls back to `scipy.stats.gaussian_kde`, which evaluates in
+    O(N * len(grid)).
+    """
+    try:
+        from KDEpy import FFTKDE
+    except ImportError:
+        FFTKDE = None
+
+    if FFTKDE is not None:
+        kde = FFTKDE(bw="silverman").fit(dist)
+        try:
+            return kde.evaluate(grid)
+        except ValueError:
+            # the FFT estimator needs an equidistant grid strictly enclosing
+            # all samples; histogram bin edges end exactly on the extreme
+            # samples, so retry with the grid padded by one step on each side
+            step = np.diff(grid)
+            if np.allclose(step, step[0]):
+                padded = np.concatenate(
+                    ([grid[0] - step[0]], grid, [grid[-1] + step[0]])
+                )
+                try:
+                    return kde.evaluate(padded)[1:-1]
+                except ValueError:
+                    pass
+
+    from scipy import stats
+
+    return stats.gaussian_kde(dist)(grid)
+
+
 def _plot_chain_func(sampler, p, last_step=False):
     chain = sampler.chain
     label = sampler.labels[p]
 
     import matplotlib.pyplot as plt
 
-    from scipy import stats
-
     if len(chain.shape) > 2:
         traces = chain[:, :, p]
         if last_step:
@@ -154,10 +221,28 @@ def _plot_chain_func(sampler, p, last_step=False):
     red = np.arange(nwalkers) / float(nwalkers) >= thresh
 
     ax1.set_rasterization_zorder(1)
-    for t in traces[~red]:  # range(nwalkers):
-        ax1.plot(t, color=(0.1,) * 3, lw=1.0, alpha=0.25, zorder=0)
-    for t in traces[red]:
-        ax1.plot(t, color=color_cycle[0], lw=1.5, alpha=0.75, zorder=0)
+    # one collection per style draws all traces as a single artist instead
+    # of one Line2D per walker
+    from matplotlib.collections import LineCollection
+
+    segments = np.empty((nwalkers, nsteps, 2))
+    segments[:, :, 0] = np.arange(nsteps)
+    segments[:, :, 1] = traces
+    for sel, color, lw, alpha in (
+        (~red, (0.1,) * 3, 1.0, 0.25),
+        (red, color_cycle[0], 1.5, 0.75),
+    ):
+        if np.any(sel):
+            ax1.add_collection(
+                LineCollection(
+                    segments[sel],
+                    colors=[color],
+                    linewidths=lw,
+                    alpha=alpha,
+                    zorder=0,
+                )
+            )
+    ax1.autoscale_view()
     ax1.set_xlabel("step number")
     # [l.set_rotation(45) for l in ax1.get_yticklabels()]
     ax1.set_ylabel(label)
@@ -166,16 +251,11 @@ def _plot_chain_func(sampler, p, last_step=False):
 
     nbins = min(max(25, int(len(dist) / 100.0)), 100)
     xlabel = label
-    n, x, _ = ax2.hist(
-        dist,
-        nbins,
-        histtype="stepfilled",
-        color=color_cycle[0],
-        lw=0,
-        density=True,
-    )
-    kde = stats.kde.gaussian_kde(dist)
-    ax2.plot(x, kde(x), color="k", label="KDE")
+    # Bin once with np.histogram and reuse the edges as KDE grid, rather
+    # than having ax2.hist and the KDE each do their own pass over dist
+    n, x = np.histogram(dist, nbins, density=True)
+    ax2.stairs(n, x, fill=True, color=color_cycle[0], lw=0)
+    ax2.plot(x, _kde_evaluate(dist, x), color="k", label="KDE")
     quant = [16, 50, 84]
     xquant = np.percentile(dist, quant)
     quantiles = dict(zip(quant, xquant))
@@ -206,17 +286,10 @@ def _plot_chain_func(sampler, p, last_step=False):
 
     # Print distribution parameters on lower-left
 
-    try:
-        try:
-            ac = sampler.get_autocorr_time()[p]
-        except AttributeError:
-            ac = autocorr.integrated_time(
-                np.mean(chain, axis=0), axis=0, fast=False
-            )[p]
-        autocorr_message = "{0:.1f}".format(ac)
-    except autocorr.AutocorrError:
-        # Raised when chain is too short for meaningful auto-correlation
-        # estimation
+    acort = _get_autocorr_times(sampler)
+    if acort is not None:
+        autocorr_message = "{0:.1f}".format(acort[p])
+    else:
         autocorr_message = None
 
     if last_step:
@@ -285,6 +358,36 @@ def _plot_chain_func(sampler, p, last_step=False):
     return f
 
 
+def _flat_blob_quantity(blobs, modelidx, item=None):
+    """
+    Stack one blob across all steps and walkers into a single Quantity.
+
+    The values are written into a preallocated array instead of accumulating
+    a Python list of per-walker Quantities, which would hold the whole chain
+    twice while it is converted to an array.
+    """
+    blob0 = blobs[0][0][modelidx]
+    if item is not None:
+        blob0 = blob0[item]
+
+    unit = blob0.unit if isinstance(blob0, u.Quantity) else u.Unit("")
+    out = np.empty((len(blobs) * len(blobs[0]),) + np.shape(blob0))
+
+    k = 0
+    for step in blobs:
+        for walkerblob in step:
+            blob = walkerblob[modelidx]
+            if item is not None:
+                blob = blob[item]
+            if isinstance(blob, u.Quantity):
+                out[k] = blob.to_value(unit)
+            else:
+                out[k] = blob
+            k += 1
+
+    return out * unit
+
+
 def _process_blob(sampler, modelidx, last_step=False, energy=None):
     """
     Process binary blob in sampler. If blob in position modelidx is:
@@ -316,22 +419,14 @@ def _process_blob(sampler, modelidx, last_step=False, energy=None):
         if last_step:
             model = u.Quantity([m[modelidx] for m in blobs[-1]])
         else:
-            model = []
-            for step in blobs:
-                for walkerblob in step:
-                    model.append(walkerblob[modelidx])
-            model = u.Quantity(model)
+            model = _flat_blob_quantity(blobs, modelidx)
     elif np.isscalar(blob0):
         modelx = None
 
         if last_step:
             model = u.Quantity([m[modelidx] for m in blobs[-1]])
         else:
-            model = []
-            for step in blobs:
-                for walkerblob in step:
-                    model.append(walkerblob[modelidx])
-            model = u.Quantity(model)
+            model = _flat_blob_quantity(blobs, modelidx)
     elif isinstance(blob0, list) or isinstance(blob0, tuple):
         if (
             len(blob0) == 2
@@ -344,11 +439,7 @@ def _process_blob(sampler, modelidx, last_step=False, energy=None):
             if last_step:
                 model = u.Quantity([m[modelidx][1] for m in blobs[-1]])
             else:
-                model = []
-                for step in blobs:
-                    for walkerblob in step:
-                        model.append(walkerblob[modelidx][1])
-                model = u.Quantity(model)
+                model = _flat_blob_quantity(blobs, modelidx, item=1)
         else:
             raise TypeError("Model {0} has wrong blob format".format(modelidx))
 
@@ -509,20 +600,15 @@ def _calc_CI(
         threads=threads,
     )
 
-    nwalkers = len(model) - 1
-    CI = []
+    # compute all quantile levels in a single partition per energy bin; the
+    # "lower" method reproduces the order statistic previously selected as
+    # sorted[int(f * (nsamples - 1))]
+    qs = []
     for conf in confs:
-        fmin = stats.norm.cdf(-conf)
-        fmax = stats.norm.cdf(conf)
-        ymin, ymax = [], []
-        for fr, y in ((fmin, ymin), (fmax, ymax)):
-            nf = int((fr * nwalkers))
-            for i in range(len(modelx)):
-                ysort = np.sort(model[:, i])
-                y.append(ysort[nf])
-
-        # create an array from lists ymin and ymax preserving units
-        CI.append((u.Quantity(ymin), u.Quantity(ymax)))
+        qs += [stats.norm.cdf(-conf), stats.norm.cdf(conf)]
+
+    qvals = np.quantile(model.value, qs, axis=0, method="lower") * model.unit
+    CI = [(qvals[2 * i], qvals[2 * i + 1]) for i in range(len(confs))]
 
     return modelx, CI
 
@@ -698,7 +784,17 @@ def find_ML(sampler, modelidx):
     """
     Find Maximum Likelihood parameters as those in the chain with a highest log
     probability.
+
+    The result is cached on the sampler keyed by the chain shape, as a single
+    `plot_fit` call needs it several times and each computation scans the full
+    chain.
     """
+    key = (modelidx, sampler.chain.shape)
+    try:
+        return sampler._find_ML_cache[key]
+    except (AttributeError, KeyError):
+        pass
+
     index = np.unravel_index(
         np.argmax(sampler.lnprobability), sampler.lnprobability.shape
     )
@@ -723,13 +819,16 @@ def find_ML(sampler, modelidx):
     else:
         modelx, model_ML = None, None
 
-    MLerr = []
-    for dist in sampler.flatchain.T:
-        hilo = np.percentile(dist, [16.0, 84.0])
-        MLerr.append((hilo[1] - hilo[0]) / 2.0)
+    hilo = np.percentile(sampler.flatchain, [16.0, 84.0], axis=0)
+    MLerr = (hilo[1] - hilo[0]) / 2.0
     ML = sampler.lnprobability[index]
 
-    return ML, MLp, MLerr, (modelx, model_ML)
+    result = (ML, MLp, MLerr, (modelx, model_ML))
+    try:
+        sampler._find_ML_cache[key] = result
+    except AttributeError:
+        sampler._find_ML_cache = {key: result}
+    return result
 
 
 def plot_blob(
@@ -1211,14 +1310,9 @@ def _plot_residuals_to_ax(
 
     ax.axhline(0, color="k", lw=1, ls="--")
 
-    interp = False
-    if data_all["energy"].size != MLene.size or not np.allclose(
+    interp = data_all["energy"].size != MLene.size or not np.allclose(
         data_all["energy"].value, MLene.value
-    ):
-        interp = True
-        from scipy.interpolate import interp1d
-
-        modelfunc = interp1d(MLene.value, MLflux.value, bounds_error=False)
+    )
 
     for g in groups:
         groupidx = np.where(data_all["group"] == g)
@@ -1234,7 +1328,16 @@ def _plot_residuals_to_ax(
         dflux = (dflux * dsedf).to(df_unit)[notul]
 
         if interp:
-            difference = flux[notul] - modelfunc(ene[notul]) * flux.unit
+            # np.interp does the single C-level pass we need here without
+            # the setup cost of building an interp1d object per plot
+            model_at_ene = np.interp(
+                ene[notul].value,
+                MLene.value,
+                MLflux.value,
+                left=np.nan,
+                right=np.nan,
+            )
+            difference = flux[notul] - model_at_ene * flux.unit
         else:
             difference = flux[notul] - MLflux[groupidx][notul]
 
@@ -1258,7 +1361,7 @@ def _plot_residuals_to_ax(
         ax.errorbar(
             ene[notul].value,
             (difference / dflux).decompose().value,
-            yerr=(dflux / dflux).decompose().value,
+            yerr=np.ones(len(dflux)),
             xerr=xerr[:, notul].to(e_unit).value,
             **opts
         )
@@ -1373,7 +1476,6 @@ def plot_data(
 def plot_distribution(samples, label, figure=None):
     """ Plot a distribution and print statistics about it"""
 
-    from scipy import stats
     import matplotlib.pyplot as plt
 
     quant = [16, 50, 84]
@@ -1421,17 +1523,12 @@ def plot_distribution(samples, label, figure=None):
     else:
         samples_nounit = samples
 
-    n, x, _ = ax.hist(
-        samples_nounit,
-        histnbins,
-        histtype="stepfilled",
-        color=color_cycle[0],
-        lw=0,
-        density=True,
-    )
+    # Bin once with np.histogram and reuse the edges as KDE grid, rather
+    # than having ax.hist and the KDE each do their own pass over samples
+    n, x = np.histogram(samples_nounit, histnbins, density=True)
+    ax.stairs(n, x, fill=True, color=color_cycle[0], lw=0)
 
-    kde = stats.kde.gaussian_kde(samples_nounit)
-    ax.plot(x, kde(x), color="k", label="KDE")
+    ax.plot(x, _kde_evaluate(samples_nounit, x), color="k", label="KDE")
 
     ax.axvline(
         quantiles[50],
@@ -11,6 +11,13 @@ from ..core import run_sampler, uniform_prior
 fname = get_pkg_data_filename("data/CrabNebula_HESS_ipac.dat")
 data_table = ascii.read(fname)
 
+# Normalization energy for the model: the logarithmic mean of the first and
+# last data points. It does not depend on the sampled parameters, so it is
+# computed once here instead of at every likelihood call.
+e_0 = np.sqrt(
+    u.Quantity(data_table["energy"])[0] * u.Quantity(data_table["energy"])[-1]
+)
+
 # Model definition
 def cutoffexp(pars, input_data):
     """
@@ -26,9 +33,7 @@ def cutoffexp(pars, input_data):
     data = input_data
 
     x = data["energy"].copy()
-    # take logarithmic mean of first and last data points as normalization
-    # energy
-    x0 = np.sqrt(x[0] * x[-1])
+    x0 = e_0
 
     N = np.exp(pars[0])
     gamma = pars[1]
@@ -36,10 +41,14 @@ def cutoffexp(pars, input_data):
     # beta  = pars[3]
     beta = 1.0
 
+    # Combine the powerlaw and cutoff factors into a single np.exp in log
+    # domain, which saves one vectorized pow per call
     flux = (
         N
-        * (x / x0) ** -gamma
-        * np.exp(-(x / ecut) ** beta)
+        * np.exp(
+            -gamma * np.log((x / x0).to_value(""))
+            - (x / ecut).to_value("") ** beta
+        )
         * u.Unit("1/(cm2 s TeV)")
     )
 
@@ -48,14 +57,14 @@ def cutoffexp(pars, input_data):
         np.logspace(np.log10(x[0].value) - 1, np.log10(x[-1].value) + 1, 100)
         * x.unit
     )
-    model = (
-        N * (ene / x0) ** -gamma * np.exp(-(ene / ecut) ** beta)
-    ) * u.Unit("1/(cm2 s TeV)")
+    shape = N * np.exp(
+        -gamma * np.log((ene / x0).to_value(""))
+        - (ene / ecut).to_value("") ** beta
+    )
+    model = shape * u.Unit("1/(cm2 s TeV)")
 
     # save a particle energy distribution
-    model_part = (
-        N * (ene / x0) ** -gamma * np.exp(-(ene / ecut) ** beta)
-    ) * u.Unit("1/(TeV)")
+    model_part = shape * u.Unit("1/(TeV)")
 
     # save a broken powerlaw in luminosity units
     _model1 = (
@@ -366,13 +366,18 @@ def trapz_loglog(y, x, axis=-1, intervals=False):
 
 def _generate_energy_edges_single(ene):
     """Generate energy edges for single group"""
-    midene = np.sqrt((ene[1:] * ene[:-1]))
-    elo, ehi = np.zeros(len(ene)) * ene.unit, np.zeros(len(ene)) * ene.unit
-    elo[1:] = ene[1:] - midene
-    ehi[:-1] = midene - ene[:-1]
-    elo[0] = ene[0] * (1 - ene[0] / (ene[0] + ehi[0]))
+    # work on the bare values and attach the unit once on return; the edges
+    # must start zeroed because a single-point group has no interior edges
+    # and ehi[0] is read before being written
+    ene_v = ene.value
+    midene = np.sqrt(ene_v[1:] * ene_v[:-1])
+    eloehi = np.zeros((2, len(ene_v)))
+    elo, ehi = eloehi
+    elo[1:] = ene_v[1:] - midene
+    ehi[:-1] = midene - ene_v[:-1]
+    elo[0] = ene_v[0] * (1 - ene_v[0] / (ene_v[0] + ehi[0]))
     ehi[-1] = elo[-1]
-    return u.Quantity([elo, ehi])
+    return eloehi * ene.unit
 
 
 def generate_energy_edges(ene, groups=None):
@@ -396,7 +401,7 @@ def generate_energy_edges(ene, groups=None):
     if groups is None or len(ene) != len(groups):
         return _generate_energy_edges_single(ene)
     else:
-        eloehi = np.zeros((2, len(ene))) * ene.unit
+        eloehi = np.empty((2, len(ene))) * ene.unit
         for g in np.unique(groups):
             group_edges = _generate_energy_edges_single(ene[groups == g])
             eloehi[:, groups == g] = group_edges